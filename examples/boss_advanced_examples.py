@@ -8,7 +8,7 @@
 import sys
 sys.path.insert(0, '..')
 
-import time
+from collections import Counter
 from typing import List, Dict, Any
 from generic_app_spider import GenericAppSpider
 from rich.console import Console
@@ -63,6 +63,24 @@ class CustomScrollSpider(GenericAppSpider):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.scroll_count = 0
+        self._normal_scroll_coords = None
+    
+    def connect_device(self) -> bool:
+        """连接设备后额外预计算正常滚动坐标"""
+        if not super().connect_device():
+            return False
+        
+        self._init_normal_scroll_coords()
+        return True
+    
+    def _init_normal_scroll_coords(self) -> None:
+        """计算正常滚动坐标：从屏幕80%位置向30%位置滑动，屏幕尺寸未读取时先读取"""
+        if self._screen_size is None:
+            self._init_scroll_coords()
+        
+        screen_width, screen_height = self._screen_size
+        x = screen_width // 2
+        self._normal_scroll_coords = (x, int(screen_height * 0.8), x, int(screen_height * 0.3))
     
     def scroll_page(self) -> None:
         """自定义滚动逻辑"""
@@ -72,22 +90,21 @@ class CustomScrollSpider(GenericAppSpider):
         self.scroll_count += 1
         
         try:
-            screen_width, screen_height = self.device.window_size()
+            # 未经 connect_device 连接时（如直接赋值 device）在此补算坐标
+            if self._normal_scroll_coords is None:
+                self._init_normal_scroll_coords()
             
             # 根据滚动次数调整滚动幅度
             if self.scroll_count % 3 == 0:
-                # 每3次做一次大幅度滚动
-                start_y = int(screen_height * 0.9)
-                end_y = int(screen_height * 0.2)
+                # 每3次做一次大幅度滚动（复用父类缓存的 90% -> 20% 坐标）
+                coords = self._scroll_coords
                 console.print("[yellow]执行大幅度滚动...[/yellow]")
             else:
                 # 正常滚动
-                start_y = int(screen_height * 0.8)
-                end_y = int(screen_height * 0.3)
+                coords = self._normal_scroll_coords
             
-            x = int(screen_width / 2)
-            self.device.swipe(x, start_y, x, end_y, duration=0.3)
-            time.sleep(self.scroll_sleep)
+            self.device.swipe(*coords, duration=0.3)
+            self._wait_for_list()
             
         except Exception as e:
             console.print(f"[red]滚动失败: {e}[/red]")
@@ -138,23 +155,17 @@ def example_data_processing():
         console.print("\n[cyan]== 数据分析 ==[/cyan]")
         
         # 统计薪资分布
-        salary_ranges = {}
-        for item in data:
-            salary = item.get("薪资待遇", "未知")
-            salary_ranges[salary] = salary_ranges.get(salary, 0) + 1
+        salary_counter = Counter(item.get("薪资待遇", "未知") for item in data)
         
         console.print("\n[yellow]薪资分布:[/yellow]")
-        for salary, count in sorted(salary_ranges.items(), key=lambda x: x[1], reverse=True)[:5]:
+        for salary, count in salary_counter.most_common(5):
             console.print(f"  {salary}: {count} 个职位")
         
         # 统计热门公司
-        companies = {}
-        for item in data:
-            company = item.get("公司名称", "未知")
-            companies[company] = companies.get(company, 0) + 1
+        company_counter = Counter(item.get("公司名称", "未知") for item in data)
         
         console.print("\n[yellow]招聘最多的公司 TOP 5:[/yellow]")
-        for company, count in sorted(companies.items(), key=lambda x: x[1], reverse=True)[:5]:
+        for company, count in company_counter.most_common(5):
             console.print(f"  {company}: {count} 个职位")
 
 
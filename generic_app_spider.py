@@ -6,19 +6,59 @@
 """
 
 import uiautomator2 as u2
+import os
+import sys
 import time
 import json
+import hashlib
 from datetime import datetime
-from typing import Any, Dict, List, Set, Optional, Callable
+from typing import Any, BinaryIO, Dict, Iterator, List, Set, Optional, Callable, Tuple
 
+from lxml import etree
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+from rich.progress import Progress, TextColumn, BarColumn
 from rich.table import Table
 from rich.panel import Panel
 
+try:
+    import orjson  # 可选依赖：更快的JSON序列化，原生输出UTF-8
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash  # 可选依赖：更快的64位去重摘要
+except ImportError:
+    xxhash = None
+
 console = Console()
 
 
+def _noop(*args: Any, **kwargs: Any) -> None:
+    """未传入回调时使用的空函数"""
+
+
+def _intern(text: str) -> str:
+    """驻留较短的字段值：公司名、地点等在大量数据中重复出现，共享同一个字符串对象"""
+    return sys.intern(text) if len(text) < 64 else text
+
+
+def _dumps(obj: Any, pretty: bool = False) -> bytes:
+    """序列化为UTF-8编码的JSON，优先使用 orjson；pretty 为 True 时缩进2个空格"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None).encode('utf-8')
+
+
+def _digest64(data: bytes) -> int:
+    """计算64位整数摘要，优先使用 xxh3，未安装时回退到 blake2b"""
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
 class GenericAppSpider:
     """
     通用 App 爬虫类
@@ -36,7 +76,12 @@ class GenericAppSpider:
         unique_keys: Optional[List[str]] = None,
         output_prefix: str = "data",
         title: str = "通用数据爬虫",
-        max_empty_scrolls: int = 3
+        max_empty_scrolls: int = 3,
+        stream_output: bool = False,
+        idle_timeout_ms: int = 100,
+        keep_in_memory: bool = True,
+        verbose: bool = False,
+        compressed_dump: bool = False
     ):
         """
         初始化爬虫
@@ -49,11 +94,25 @@ class GenericAppSpider:
             selectors: 字段选择器映射，key为中文字段名，value为resourceId
                       例如: {"职位名称": "com.xxx:id/tv_name"}
             max_items: 最大数据条数，默认100
-            scroll_sleep: 滚动后等待时间（秒），默认2.5
+            scroll_sleep: 滚动后最长等待时间（秒），默认2.5
+                          列表就绪后会提前返回，不必每次都等满
             unique_keys: 用于去重的字段列表，默认使用第一个字段
             output_prefix: 输出文件名前缀，默认"data"
             title: 爬虫标题，用于显示
             max_empty_scrolls: 连续多少次无新数据时停止，默认3次
+            stream_output: 是否保留边抓取边追加写入的 JSON Lines 文件
+                          （{output_prefix}_{时间戳}.jsonl），默认False
+                          抓取过程中总会写入该文件作为检查点，异常退出也不丢数据；
+                          关闭时最终JSON保存成功后自动删除
+            idle_timeout_ms: UiAutomator 等待界面空闲/查找元素的超时（毫秒），默认100
+                            驱动默认值长达10秒，App界面持续刷新时可适当调大
+            keep_in_memory: 是否在内存中保留全部数据（get_data 依赖），默认True
+                           关闭后数据只写入 JSON Lines 文件（自动开启 stream_output），
+                           结束时再由该文件生成最终JSON，内存占用不随数据量增长
+            verbose: 是否输出每次滚动的详细日志，默认False（进度条已显示抓取进度）
+            compressed_dump: 是否以压缩模式获取页面层次结构，默认False
+                            压缩模式会省略不重要的布局节点，XML更小、传输更快，
+                            但可能连同容器节点一起省略，开启前请确认容器仍能被找到
         """
         self.app_package = app_package
         self.container_selector = container_selector
@@ -63,6 +122,16 @@ class GenericAppSpider:
         self.output_prefix = output_prefix
         self.title = title
         self.max_empty_scrolls = max_empty_scrolls
+        self.keep_in_memory = keep_in_memory
+        # 不保留内存数据时必须流式落盘，否则数据会丢失
+        self.stream_output = stream_output or not keep_in_memory
+        self.idle_timeout_ms = idle_timeout_ms
+        self.verbose = verbose
+        self.compressed_dump = compressed_dump
+        
+        # 输出文件名只生成一次，JSON Lines 检查点与最终JSON共用同一时间戳
+        self._run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._default_filename = f"{output_prefix}_{self._run_timestamp}.json"
         
         # 去重字段配置
         if unique_keys:
@@ -70,11 +139,57 @@ class GenericAppSpider:
         else:
             # 默认使用第一个字段作为去重键
             self.unique_keys = [list(selectors.keys())[0]] if selectors else []
+        self._unique_key_fields: Tuple[str, ...] = tuple(self.unique_keys)
         
         # 运行时数据
         self.device: Optional[u2.Device] = None
         self.data_list: List[Dict[str, Any]] = []
-        self.seen_items: Set[str] = set()
+        self.item_count = 0  # 已抓取条数（keep_in_memory=False 时 data_list 为空）
+        # 各去重字段的不同取值（存哈希值），随抓取实时更新，统计时无需再遍历数据
+        self._field_unique: Dict[str, Set[int]] = {
+            field: set() for field in self.unique_keys if field in selectors
+        }
+        self.seen_items: Set[int] = set()  # 存放定长64位摘要，而非完整的拼接字符串
+        
+        # 屏幕尺寸与滑动坐标在连接设备后计算一次，避免每次滚动都发起RPC
+        self._screen_size: Optional[Tuple[int, int]] = None
+        self._scroll_coords: Optional[Tuple[int, int, int, int]] = None
+        
+        # 滚动后确认稳定时拿到的页面XML，下一次解析直接复用，省去一次 dump
+        self._page_source: Optional[str] = None
+        
+        # 流式输出文件（在 run 中打开，同时作为中途崩溃时的检查点）
+        self._stream: Optional[BinaryIO] = None
+        self._stream_filename: Optional[str] = None
+        
+        # XML解析器复用于每一页：不收集id、去除空白文本节点
+        self._xml_parser = etree.XMLParser(
+            remove_blank_text=True, collect_ids=False, huge_tree=True
+        )
+        
+        # 预编译XPath表达式，每页解析时直接调用，无需重复编译
+        self._container_xpath = etree.XPath(f'//node[@resource-id="{container_selector}"]')
+        # smart_strings=False：属性值直接返回普通字符串，不额外构造携带父节点引用的结果对象
+        self._field_xpaths: Tuple[Tuple[str, etree.XPath], ...] = tuple(
+            (
+                field_name,
+                etree.XPath(
+                    f'.//node[@resource-id="{resource_id}"]/@text', smart_strings=False
+                )
+            )
+            for field_name, resource_id in selectors.items()
+        )
+        # 去重字段与其余字段分开：重复条目只需解析去重字段即可跳过
+        self._key_field_xpaths = tuple(
+            (field_name, xpath) for field_name, xpath in self._field_xpaths
+            if field_name in self._unique_key_fields
+        )
+        self._other_field_xpaths = tuple(
+            (field_name, xpath) for field_name, xpath in self._field_xpaths
+            if field_name not in self._unique_key_fields
+        )
+        # 数据项模板：字段顺序与 selectors 一致，缺失字段默认为空字符串
+        self._item_template: Dict[str, Any] = dict.fromkeys(selectors, "")
         
         # 获取主字段名（用于统计）
         self.primary_field = list(selectors.keys())[0] if selectors else "数据"
@@ -86,6 +201,10 @@ class GenericAppSpider:
             self.device = u2.connect()
             if self.device:
                 device_name = self.device.info.get('productName', '未知设备')
+                
+                self._init_scroll_coords()
+                self._configure_timeouts()
+                
                 console.print(f"[green]✓ 设备已连接: {device_name}[/green]")
                 return True
             else:
@@ -95,6 +214,28 @@ class GenericAppSpider:
             console.print(f"[red]✗ 设备连接失败: {e}[/red]")
             return False
     
+    def _init_scroll_coords(self) -> None:
+        """读取一次屏幕尺寸并预计算滑动坐标：从屏幕90%位置向20%位置滑动"""
+        screen_width, screen_height = self.device.window_size()
+        self._screen_size = (screen_width, screen_height)
+        x = screen_width // 2
+        self._scroll_coords = (x, int(screen_height * 0.9), x, int(screen_height * 0.2))
+    
+    def _configure_timeouts(self) -> None:
+        """
+        缩短 UiAutomator 的空闲等待
+        
+        默认每次 dump/查找前都会等待界面空闲最长10秒，列表页动画不断时会明显拖慢抓取；
+        滚动循环自身有空滚动重试，不需要驱动层这么保守的等待
+        """
+        try:
+            self.device.jsonrpc.setConfigurator({
+                "waitForIdleTimeout": self.idle_timeout_ms,
+                "waitForSelectorTimeout": self.idle_timeout_ms
+            })
+        except Exception as e:
+            console.print(f"[yellow]⚠ 设置空闲等待超时失败，使用驱动默认值: {e}[/yellow]")
+    
     def launch_app(self) -> bool:
         """启动目标App"""
         console.print(f"[cyan]正在启动 {self.app_package}...[/cyan]")
@@ -102,44 +243,90 @@ class GenericAppSpider:
             console.print("[red]✗ 设备未连接，无法启动App[/red]")
             return False
         
+        # 重新启动后，之前缓存的页面XML已失效
+        self._page_source = None
         try:
             self.device.app_start(self.app_package)
-            time.sleep(3)  # 等待App启动
             
-            # 检查App是否在前台
-            current_app = self.device.app_current()
-            if current_app and current_app.get('package') == self.app_package:
-                console.print("[green]✓ App已启动并在前台运行[/green]")
-                return True
-            else:
+            # 轮询检查App是否在前台，最多等待8秒，切到前台即继续
+            deadline = time.monotonic() + 8.0
+            in_foreground = False
+            while True:
+                current_app = self.device.app_current()
+                if current_app and current_app.get('package') == self.app_package:
+                    in_foreground = True
+                    break
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(0.2)
+            
+            if not in_foreground:
                 current_package = current_app.get('package') if current_app else '无'
                 console.print(f"[yellow]⚠ 当前前台App: {current_package}[/yellow]")
                 return False
         except Exception as e:
             console.print(f"[red]✗ App启动失败: {e}[/red]")
             return False
+        
+        # 等待首屏列表稳定，稳定时的XML直接供第一次解析使用；
+        # App已在前台，等待失败不影响启动结果，首次解析时重新获取页面即可
+        try:
+            self._wait_for_list()
+        except Exception as e:
+            self._page_source = None
+            console.print(f"[yellow]⚠ 等待首屏列表失败: {e}[/yellow]")
+        console.print("[green]✓ App已启动并在前台运行[/green]")
+        return True
     
-    def _generate_unique_key(self, item: Dict[str, Any]) -> str:
+    def _generate_unique_key(self, item: Dict[str, Any]) -> Optional[int]:
         """
         根据配置的字段生成唯一键
         
+        以单元分隔符(\\x1f)拼接去重字段后取64位摘要，去重集合每项只占用一个定长整数
+        
         Args:
             item: 数据项
             
         Returns:
-            唯一键字符串
+            唯一键摘要，去重字段全部为空时返回 None
         """
-        key_parts = [str(item.get(field, '')) for field in self.unique_keys]
-        return "_".join(key_parts)
+        get = item.get
+        key_parts = [str(get(field, '')) for field in self._unique_key_fields]
+        key = "\x1f".join(key_parts)
+        if not key:
+            return None
+        return _digest64(key.encode('utf-8'))
     
-    def parse_items(self) -> List[Dict[str, Any]]:
+    def _dump_hierarchy(self, source: Optional[str] = None) -> etree._Element:
+        """
+        获取当前页面的UI层次结构
+        
+        一次 dump_hierarchy 调用即可拿到整页XML，替代逐个元素的RPC查询
+        
+        Args:
+            source: 已获取的层次结构XML，传入时直接解析，不再发起RPC
+        
+        Returns:
+            XML根节点
+        """
+        # 缓存的XML只使用一次：显式传入 source 时同样丢弃，避免之后误用过期的页面
+        cached, self._page_source = self._page_source, None
+        if source is None:
+            # 优先使用滚动后等待稳定时缓存的XML
+            source = cached
+        if source is None:
+            source = self.device.dump_hierarchy(compressed=self.compressed_dump)
+        return etree.fromstring(source.encode('utf-8'), self._xml_parser)
+    
+    def parse_items(self, source: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         基于容器的解析方案
         
         原理:
-        1. 查找所有列表项容器（通过 container_selector）
-        2. 在每个容器内查找子元素（利用 UI 层次结构）
-        3. 确保每个容器内的字段属于同一条数据
+        1. 一次性 dump 当前页面的 UI 层次结构（单次RPC）
+        2. 查找所有列表项容器（通过 container_selector）
+        3. 在每个容器内查找子元素（利用 UI 层次结构）
+        4. 确保每个容器内的字段属于同一条数据
         
         优点:
         - 最准确: 利用 UI 层次结构，字段关联性100%正确
@@ -147,6 +334,10 @@ class GenericAppSpider:
         - 零错配: 每个容器内的字段必然属于同一条数据
         - 支持复杂布局: 即使字段分布不规则也能正确解析
         
+        Args:
+            source: 已获取的层次结构XML（如等待页面稳定时拿到的），
+                    不传则重新 dump 当前页面
+        
         Returns:
             数据项列表
         """
@@ -155,49 +346,52 @@ class GenericAppSpider:
             return items_in_page
         
         try:
-            # 查找所有容器
-            containers = self.device(resourceId=self.container_selector)
-            container_count = containers.count
+            # 一次性获取整页UI层次结构，后续查找均在本地完成，不再逐个元素发起RPC
+            root = self._dump_hierarchy(source)
+            containers = self._container_xpath(root)
+            container_count = len(containers)
             
             if container_count == 0:
                 console.print("[yellow]⚠ 未找到容器元素，请检查 container_selector 配置[/yellow]")
                 console.print(f"[yellow]   配置的容器: {self.container_selector}[/yellow]")
                 return items_in_page
             
-            console.print(f"[dim]找到 {container_count} 个容器[/dim]")
+            if self.verbose:
+                console.print(f"[dim]找到 {container_count} 个容器[/dim]")
             
             # 遍历每个容器
-            for i in range(container_count):
+            for i, container in enumerate(containers):
+                # 已凑够目标数量，本页剩余容器无需再解析
+                if self.item_count + len(items_in_page) >= self.max_items:
+                    break
+                
                 try:
-                    container = containers[i]
-                    item: Dict[str, Any] = {}
-                    has_valid_data = False
+                    item = self._item_template.copy()
+                    
+                    # 先只提取去重字段：已抓取过的条目无需再解析其余字段
+                    # （关键：相对路径只搜索容器的子孙节点）
+                    for field_name, field_xpath in self._key_field_xpaths:
+                        texts = field_xpath(container)
+                        if texts:
+                            item[field_name] = texts[0].strip()
+                    
+                    item_key = self._generate_unique_key(item)
+                    if item_key is None or item_key in self.seen_items:
+                        continue
                     
-                    # 在容器内查找各个字段
-                    for field_name, resource_id in self.selectors.items():
-                        try:
-                            # 在容器内查找元素（关键：child 方法）
-                            element = container.child(resourceId=resource_id)
-                            if element.exists:
-                                text = element.get_text()
-                                if text and text.strip():
-                                    item[field_name] = text.strip()
-                                    has_valid_data = True
-                                else:
-                                    item[field_name] = ""
-                            else:
-                                item[field_name] = ""
-                        except Exception as e:
-                            item[field_name] = ""
-                            continue
+                    for field_name, field_xpath in self._other_field_xpaths:
+                        texts = field_xpath(container)
+                        if texts:
+                            item[field_name] = texts[0].strip()
                     
                     # 只有至少有一个有效字段才添加
-                    if has_valid_data:
-                        # 去重检查
-                        item_key = self._generate_unique_key(item)
-                        if item_key and item_key not in self.seen_items:
-                            self.seen_items.add(item_key)
-                            items_in_page.append(item)
+                    if any(item.values()):
+                        # 只有保留在内存中的新数据才值得驻留，流式模式下数据不留存，驻留反而常驻内存
+                        if self.keep_in_memory:
+                            for field_name, value in item.items():
+                                item[field_name] = _intern(value)
+                        self.seen_items.add(item_key)
+                        items_in_page.append(item)
                             
                 except Exception as e:
                     console.print(f"[yellow]解析第{i}个容器时出错: {e}[/yellow]")
@@ -214,69 +408,309 @@ class GenericAppSpider:
             return
         
         try:
-            screen_width, screen_height = self.device.window_size()
+            # 未经 connect_device 直接设置 device 时，首次滚动再计算坐标
+            if self._scroll_coords is None:
+                self._init_scroll_coords()
             
-            # 从屏幕90%位置向20%位置滑动
-            start_y = int(screen_height * 0.9)
-            end_y = int(screen_height * 0.2)
-            x = int(screen_width / 2)
-            
-            self.device.swipe(x, start_y, x, end_y, duration=0.3)
-            time.sleep(self.scroll_sleep)
+            self.device.swipe(*self._scroll_coords, duration=0.3)
+            self._wait_for_list()
             
         except Exception as e:
             console.print(f"[red]滚动失败: {e}[/red]")
     
-    def save_data(self, filename: Optional[str] = None) -> None:
+    def _wait_for_list(self) -> None:
+        """
+        滚动后等待列表稳定
+        
+        短暂等待惯性滑动后，连续 dump 页面层次结构，两次结果一致且包含容器即视为稳定，
+        最多等待 scroll_sleep 秒；页面稳定即返回，取代固定时长的 sleep。
+        稳定时的XML会缓存下来，供下一次 parse_items 直接解析
+        """
+        self._page_source = None
+        deadline = time.monotonic() + self.scroll_sleep
+        time.sleep(0.2)
+        previous = self.device.dump_hierarchy(compressed=self.compressed_dump)
+        while time.monotonic() < deadline:
+            time.sleep(0.1)
+            current = self.device.dump_hierarchy(compressed=self.compressed_dump)
+            if current == previous and self.container_selector in current:
+                self._page_source = current
+                return
+            previous = current
+    
+    def save_data(self, filename: Optional[str] = None) -> bool:
         """
         保存数据为JSON文件
         
+        keep_in_memory=False 时逐条读取 JSON Lines 文件生成JSON，不把数据整体载入内存
+        
         Args:
             filename: 自定义文件名，不传则自动生成
+            
+        Returns:
+            是否保存成功
         """
-        if not self.data_list:
+        count = len(self.data_list) if self.keep_in_memory else self.item_count
+        if not count:
             console.print("[yellow]⚠ 没有数据需要保存[/yellow]")
-            return
+            return False
         
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self.output_prefix}_{timestamp}.json"
+        if not self.keep_in_memory and not self._stream_filename:
+            console.print("[red]✗ 保存失败: keep_in_memory=False 时数据只在 JSON Lines 文件中，该文件未打开或已删除[/red]")
+            return False
+        
+        filename = filename or self._default_filename
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.data_list, f, ensure_ascii=False, indent=2)
+            # 1MB写缓冲：由 JSON Lines 逐条转换时合并大量小块写入，减少系统调用
+            with open(filename, 'wb', buffering=1 << 20) as f:
+                if self.keep_in_memory:
+                    f.write(_dumps(self.data_list, pretty=True))
+                else:
+                    self._write_json_from_stream(f)
             
             console.print(f"\n[green]✓ 数据已保存: {filename}[/green]")
-            console.print(f"[green]  共抓取 {len(self.data_list)} 条数据[/green]")
+            console.print(f"[green]  共抓取 {count} 条数据[/green]")
+            return True
             
         except Exception as e:
             console.print(f"[red]✗ 保存失败: {e}[/red]")
+            return False
+    
+    def _write_json_from_stream(self, f: BinaryIO) -> None:
+        """
+        将 JSON Lines 文件逐条转换为缩进格式的JSON数组，输出格式与内存模式一致
+        
+        Args:
+            f: 以二进制写模式打开的目标文件
+        """
+        loads = orjson.loads if orjson is not None else json.loads
+        separator = b"[\n"
+        with open(self._stream_filename, 'rb') as src:
+            for line in src:
+                if not line.strip():
+                    continue
+                body = _dumps(loads(line), pretty=True)
+                f.write(separator)
+                f.write(b"  " + body.replace(b"\n", b"\n  "))
+                separator = b",\n"
+        f.write(b"\n]" if separator != b"[\n" else b"[]")
+    
+    def _open_stream(self) -> bool:
+        """
+        打开 JSON Lines 流式输出文件
+        
+        Returns:
+            是否打开成功
+        """
+        filename = f"{self.output_prefix}_{self._run_timestamp}.jsonl"
+        try:
+            self._stream = open(filename, 'ab')
+            self._stream_filename = filename
+            console.print(f"[dim]实时写入检查点: {filename}[/dim]")
+            return True
+        except Exception as e:
+            console.print(f"[red]✗ 无法打开流式输出文件: {e}[/red]")
+            return False
+    
+    def _discard_stream(self, saved: bool) -> None:
+        """
+        删除作为检查点的 JSON Lines 文件
+        
+        Args:
+            saved: 最终JSON是否保存成功，未成功且有数据时保留文件以便恢复
+        """
+        if not self._stream_filename:
+            return
+        
+        if saved or not self.item_count:
+            try:
+                os.remove(self._stream_filename)
+            except OSError:
+                pass
+        else:
+            console.print(f"[yellow]⚠ 已抓取的数据保留在: {self._stream_filename}[/yellow]")
+        self._stream_filename = None
+    
+    def _write_stream(self, item: Dict[str, Any]) -> None:
+        """
+        将一条新数据追加到 JSON Lines 文件（写入缓冲区，由 _flush_stream 按页刷新）
+        
+        Args:
+            item: 新增的数据项
+        """
+        if self._stream:
+            self._stream.write(_dumps(item))
+            self._stream.write(b"\n")
+    
+    def _flush_stream(self) -> None:
+        """刷新 JSON Lines 文件：每页刷新一次，中途崩溃最多丢失当前页"""
+        if self._stream:
+            self._stream.flush()
+    
+    def _close_stream(self) -> None:
+        """关闭 JSON Lines 流式输出文件"""
+        if self._stream:
+            self._stream.close()
+            self._stream = None
+    
+    def _store_item(self, item: Dict[str, Any]) -> None:
+        """
+        保存一条新数据：计数、按需保留在内存、写入检查点、更新字段统计
+        
+        Args:
+            item: 新增的数据项
+        """
+        self.item_count += 1
+        if self.keep_in_memory:
+            self.data_list.append(item)
+        self._write_stream(item)
+        
+        for field, values in self._field_unique.items():
+            value = item.get(field)
+            if value:
+                values.add(hash(value))
     
     def show_statistics(self) -> None:
         """显示抓取统计"""
-        if not self.data_list:
+        if not self.item_count:
             return
         
         table = Table(title="抓取统计", show_header=True, header_style="bold magenta")
         table.add_column("指标", style="cyan", width=20)
         table.add_column("数值", style="green", width=20)
         
-        table.add_row(f"总{self.primary_field}数", str(len(self.data_list)))
+        table.add_row(f"总{self.primary_field}数", str(self.item_count))
         table.add_row("去重后数量", str(len(self.seen_items)))
         
-        # 如果有多个去重字段，显示每个字段的唯一值数量
-        for field in self.unique_keys:
-            if field in self.selectors:
-                unique_values = set(
-                    item.get(field, "") 
-                    for item in self.data_list 
-                    if item.get(field)
-                )
-                if unique_values:
-                    table.add_row(f"不同{field}数", str(len(unique_values)))
+        # 如果有多个去重字段，显示每个字段的唯一值数量（抓取过程中已实时统计）
+        for field, values in self._field_unique.items():
+            if values:
+                table.add_row(f"不同{field}数", str(len(values)))
         
         console.print(table)
     
+    def iter_items(
+        self,
+        before_parse: Optional[Callable] = None,
+        after_parse: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        逐条产出新抓取的数据（需先连接设备并启动App）
+        
+        解析当前页面 -> 产出本页新数据 -> 滚动，直到达到 max_items 或连续
+        max_empty_scrolls 次无新数据。产出前数据已计数、写入检查点并按
+        keep_in_memory 决定是否保留在 data_list 中；配合 keep_in_memory=False
+        可将数据直接交给下游（写数据库、写文件等），内存占用不随数据量增长。
+        直接调用时仅在 stream_output=True（keep_in_memory=False 时自动开启）时写入
+        JSON Lines 文件，结束时关闭并保留，之后可调用 save_data() 生成JSON；
+        否则不写检查点，数据只在 data_list 中
+        
+        Args:
+            before_parse: 每次解析前的回调函数
+            after_parse: 每次解析后的回调函数，接收解析结果
+        
+        Yields:
+            数据项
+        """
+        # 直接调用（未经 run）时只在需要保留 JSON Lines 时打开，结束时只关闭自己打开的；
+        # 内存模式下 run 之外没有人负责删除检查点，不打开即可避免遗留文件
+        owns_stream = self._stream is None and self.stream_output
+        if owns_stream and not self._open_stream() and not self.keep_in_memory:
+            console.print("[red]✗ keep_in_memory=False 需要写入 JSON Lines 文件，已取消抓取[/red]")
+            return
+        
+        try:
+            yield from self._iter_pages(before_parse, after_parse)
+        finally:
+            if owns_stream:
+                self._close_stream()
+    
+    def _iter_pages(
+        self,
+        before_parse: Optional[Callable],
+        after_parse: Optional[Callable[[List[Dict[str, Any]]], None]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        抓取循环本体，由 iter_items 和 run 调用；检查点文件由调用方负责打开和关闭
+        
+        Args:
+            before_parse: 每次解析前的回调函数
+            after_parse: 每次解析后的回调函数，接收解析结果
+        
+        Yields:
+            数据项
+        """
+        # 解析前回调可能改变页面（关闭弹窗、展开卡片等），此时缓存的XML已过期
+        invalidate_cache = before_parse is not None
+        
+        # 回调在循环外确定一次，循环内无需再判断是否传入
+        before_parse = before_parse or _noop
+        after_parse = after_parse or _noop
+        
+        # 用于检测是否还有新数据
+        empty_scroll_count = 0
+        scroll_count = 0
+        
+        while self.item_count < self.max_items:
+            scroll_count += 1
+            
+            # 解析前回调
+            before_parse()
+            if invalidate_cache:
+                self._page_source = None
+            
+            # 解析当前页面
+            items = self.parse_items()
+            
+            # 解析后回调
+            after_parse(items)
+            
+            if items:
+                empty_scroll_count = 0  # 重置空滚动计数
+                
+                if self.verbose:
+                    console.print(
+                        f"[green]第 {scroll_count} 次滚动: 新增 {len(items)} 条，"
+                        f"累计 {self.item_count + len(items)} 条[/green]"
+                    )
+                
+                # 逐条在产出前保存：下游中途停止（break 或抛出异常）时，
+                # 未产出的数据不计数、不写检查点，并移出去重集合，下次调用可重新抓取
+                stored = 0
+                try:
+                    for item in items:
+                        self._store_item(item)
+                        stored += 1
+                        yield item
+                finally:
+                    self._flush_stream()
+                    for item in items[stored:]:
+                        self.seen_items.discard(self._generate_unique_key(item))
+                
+                # 达到目标数量：在滚动之前退出，省去最后一次滚动和等待
+                if self.item_count >= self.max_items:
+                    console.print(f"\n[green]✓ 已达到目标数据量 {self.max_items} 条[/green]")
+                    break
+            else:
+                empty_scroll_count += 1
+                if self.verbose:
+                    console.print(
+                        f"[yellow]第 {scroll_count} 次滚动: 未获取到新数据 "
+                        f"({empty_scroll_count}/{self.max_empty_scrolls})[/yellow]"
+                    )
+                
+                # 连续多次无新数据，认为已到底部
+                if empty_scroll_count >= self.max_empty_scrolls:
+                    console.print(
+                        f"\n[yellow]⚠ 连续 {self.max_empty_scrolls} 次无新数据，"
+                        f"已到达列表底部[/yellow]"
+                    )
+                    break
+            
+            # 滚动到下一页
+            self.scroll_page()
+    
     def run(
         self, 
         before_parse: Optional[Callable] = None,
@@ -306,17 +740,21 @@ class GenericAppSpider:
         
         console.print(f"\n[cyan]开始抓取，目标数据量: {self.max_items} 条...[/cyan]\n")
         
-        # 用于检测是否还有新数据
-        empty_scroll_count = 0
-        scroll_count = 0
+        # 不保留内存数据时，检查点文件是数据的唯一去处，打不开就不再抓取
+        if not self._open_stream() and not self.keep_in_memory:
+            console.print("[red]✗ keep_in_memory=False 需要写入 JSON Lines 文件，已取消抓取[/red]")
+            return
+        
+        last_refresh = 0.0  # 上次重绘进度条的时间
         
         try:
+            # 关闭自动刷新：不启动后台刷新线程，仅在进度变化时重绘
             with Progress(
-                SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
                 BarColumn(),
                 TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                console=console
+                console=console,
+                auto_refresh=False
             ) as progress:
                 
                 task = progress.add_task(
@@ -324,58 +762,20 @@ class GenericAppSpider:
                     total=self.max_items
                 )
                 
-                while len(self.data_list) < self.max_items:
-                    scroll_count += 1
-                    
-                    # 解析前回调
-                    if before_parse:
-                        before_parse()
-                    
-                    # 解析当前页面
-                    items = self.parse_items()
-                    
-                    # 解析后回调
-                    if after_parse:
-                        after_parse(items)
-                    
-                    if items:
-                        self.data_list.extend(items)
-                        empty_scroll_count = 0  # 重置空滚动计数
-                        
-                        # 更新进度
-                        current_count = len(self.data_list)
-                        progress.update(
-                            task,
-                            completed=min(current_count, self.max_items),
-                            description=f"[cyan]正在抓取... ({current_count}/{self.max_items})"
-                        )
-                        
-                        console.print(
-                            f"[green]第 {scroll_count} 次滚动: 新增 {len(items)} 条，"
-                            f"累计 {current_count} 条[/green]"
-                        )
-                        
-                        # 达到目标数量
-                        if current_count >= self.max_items:
-                            console.print(f"\n[green]✓ 已达到目标数据量 {self.max_items} 条[/green]")
-                            break
-                    else:
-                        empty_scroll_count += 1
-                        console.print(
-                            f"[yellow]第 {scroll_count} 次滚动: 未获取到新数据 "
-                            f"({empty_scroll_count}/{self.max_empty_scrolls})[/yellow]"
-                        )
-                        
-                        # 连续多次无新数据，认为已到底部
-                        if empty_scroll_count >= self.max_empty_scrolls:
-                            console.print(
-                                f"\n[yellow]⚠ 连续 {self.max_empty_scrolls} 次无新数据，"
-                                f"已到达列表底部[/yellow]"
-                            )
-                            break
-                    
-                    # 滚动到下一页
-                    self.scroll_page()
+                # 检查点已在上面打开过，直接进入抓取循环，避免 iter_items 再次尝试打开
+                for _ in self._iter_pages(before_parse, after_parse):
+                    # 更新进度：数值每次都更新，重绘最多每0.25秒一次（退出时会再重绘一次）
+                    current_count = self.item_count
+                    now = time.monotonic()
+                    refresh = now - last_refresh >= 0.25 or current_count >= self.max_items
+                    progress.update(
+                        task,
+                        completed=min(current_count, self.max_items),
+                        description=f"[cyan]正在抓取... ({current_count}/{self.max_items})",
+                        refresh=refresh
+                    )
+                    if refresh:
+                        last_refresh = now
                 
         except KeyboardInterrupt:
             console.print("\n[yellow]⚠ 用户中断抓取[/yellow]")
@@ -384,16 +784,22 @@ class GenericAppSpider:
             console.print(f"\n[red]✗ 抓取过程中出错: {e}[/red]")
         
         finally:
+            self._close_stream()
+            
             # 显示统计
             self.show_statistics()
             
-            # 保存数据
-            self.save_data()
+            # 保存数据；未要求保留 JSON Lines 时，检查点文件在保存成功后删除
+            saved = self.save_data()
+            if not self.stream_output:
+                self._discard_stream(saved)
     
     def get_data(self) -> List[Dict[str, Any]]:
         """
         获取已抓取的数据
         
+        keep_in_memory=False 时数据只保存在 JSON Lines 文件中，此处返回空列表
+        
         Returns:
             数据列表
         """